@@ -7,49 +7,102 @@ Outputs: docs/correlation_matrix.png, docs/trend_line.png
 Run from project root with PYTHONPATH=. (e.g. make figures).
 """
 
+import hashlib
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import duckdb
-import matplotlib.pyplot as plt
-import numpy as np
+import pandas as pd
 
-from src.config import DB_PATH
+from src.config import DB_PATH, open_db
+
+# matplotlib and numpy are imported inside the plotting helpers: they are
+# the bulk of cold-start time and are skipped entirely on cache hits.
+if TYPE_CHECKING:
+    import numpy as np
 
 ROOT = Path(__file__).resolve().parent.parent
 DOCS_DIR = ROOT / "docs"
 NUM_TOP_COINS = 10  # For trend chart
+HASH_SIDECAR = DOCS_DIR / ".figures.hash"  # Content hash of the last rendered data
 
 
 def load_data():
-    """Load crypto_prices from DuckDB into a pandas DataFrame."""
+    """
+    Open a read-only DuckDB connection and load crypto_prices into pandas.
+
+    Returns the open connection alongside the DataFrame so aggregations
+    (e.g. the correlation matrix) can run inside DuckDB instead of pandas.
+    """
     path = Path(DB_PATH)
     if not path.exists():
         raise FileNotFoundError(f"DuckDB not found at {path}. Run the pipeline first: make run")
-    conn = duckdb.connect(str(path), read_only=True)
-    df = conn.execute("SELECT * FROM crypto_prices").fetchdf()
-    conn.close()
+    conn = open_db(str(path), read_only=True)
+    df = conn.execute("SELECT * FROM crypto_prices").df()
     if df.empty:
+        conn.close()
         raise ValueError("Table crypto_prices is empty. Run the pipeline first.")
-    return df
+    return conn, df
+
+
+def content_hash(df: pd.DataFrame) -> str:
+    """Stable content hash of the DataFrame, used to skip unchanged renders."""
+    return hashlib.blake2b(pd.util.hash_pandas_object(df, index=False).values.tobytes()).hexdigest()
+
+
+# DuckDB data_type strings counted as numeric for the correlation matrix
+_NUMERIC_TYPES = ("TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT", "FLOAT", "DOUBLE")
+
+
+def numeric_columns(conn) -> list[str]:
+    """Return numeric column names of crypto_prices in table order."""
+    rows = conn.execute(
+        """
+        SELECT column_name FROM information_schema.columns
+        WHERE table_name = 'crypto_prices' AND data_type IN ({})
+        ORDER BY ordinal_position
+        """.format(", ".join("?" * len(_NUMERIC_TYPES))),
+        list(_NUMERIC_TYPES),
+    ).fetchall()
+    return [r[0] for r in rows]
 
 
-def plot_correlation_matrix(df, out_path: Path) -> None:
+def correlation_matrix(conn, cols: list[str]) -> "np.ndarray":
+    """
+    Compute the correlation matrix of the given columns inside DuckDB.
+
+    Only the upper triangle is computed (one multi-threaded SELECT of
+    corr() aggregates); the lower half is mirrored by symmetry.
+    """
+    import numpy as np
+
+    pairs = [(i, j) for i in range(len(cols)) for j in range(i, len(cols))]
+    select = ", ".join(f'corr("{cols[i]}", "{cols[j]}")' for i, j in pairs)
+    values = conn.execute(f"SELECT {select} FROM crypto_prices").fetchone()
+    corr = np.empty((len(cols), len(cols)))
+    for (i, j), v in zip(pairs, values, strict=True):
+        corr[i, j] = corr[j, i] = v if v is not None else np.nan
+    return corr
+
+
+def plot_correlation_matrix(conn, out_path: Path) -> None:
     """Plot correlation matrix of numeric columns and save to out_path."""
-    numeric = df.select_dtypes(include=[np.number])
-    if numeric.shape[1] < 2:
+    import matplotlib.pyplot as plt
+
+    cols = numeric_columns(conn)
+    if len(cols) < 2:
         # Not enough columns; create a minimal placeholder
         fig, ax = plt.subplots(figsize=(6, 5))
         ax.text(0.5, 0.5, "Not enough numeric columns", ha="center", va="center")
         fig.savefig(out_path, dpi=120, bbox_inches="tight")
         plt.close(fig)
         return
-    corr = numeric.corr()
+    corr = correlation_matrix(conn, cols)
     fig, ax = plt.subplots(figsize=(8, 6))
     im = ax.imshow(corr, cmap="RdYlBu_r", vmin=-1, vmax=1, aspect="auto")
-    ax.set_xticks(range(len(corr.columns)))
-    ax.set_yticks(range(len(corr.columns)))
-    ax.set_xticklabels(corr.columns, rotation=45, ha="right")
-    ax.set_yticklabels(corr.columns)
+    ax.set_xticks(range(len(cols)))
+    ax.set_yticks(range(len(cols)))
+    ax.set_xticklabels(cols, rotation=45, ha="right")
+    ax.set_yticklabels(cols)
     plt.colorbar(im, ax=ax, label="Correlation")
     ax.set_title("Correlation matrix (numeric columns)")
     fig.tight_layout()
@@ -59,6 +112,9 @@ def plot_correlation_matrix(df, out_path: Path) -> None:
 
 def plot_trend_line(df, out_path: Path, top_n: int = NUM_TOP_COINS) -> None:
     """Plot top N coins by market cap (bar chart) as trend-style viz."""
+    import matplotlib.pyplot as plt
+    import numpy as np
+
     # Ensure we have required columns
     if "market_cap" not in df.columns or "symbol" not in df.columns:
         fig, ax = plt.subplots(figsize=(6, 4))
@@ -66,7 +122,12 @@ def plot_trend_line(df, out_path: Path, top_n: int = NUM_TOP_COINS) -> None:
         fig.savefig(out_path, dpi=120, bbox_inches="tight")
         plt.close(fig)
         return
-    top = df.nlargest(top_n, "market_cap")
+    # Partial selection: argpartition is O(n) vs. a full O(n log n) sort,
+    # then only the k selected rows are sorted for display order.
+    keys = -np.nan_to_num(df["market_cap"].to_numpy(dtype=float), nan=-np.inf)
+    k = min(top_n, len(keys))
+    idx = np.argpartition(keys, k - 1)[:k] if k < len(keys) else np.arange(len(keys))
+    top = df.iloc[idx[np.argsort(keys[idx])]]
     symbols = top["symbol"].str.upper()
     caps = top["market_cap"] / 1e9  # billions
     fig, ax = plt.subplots(figsize=(8, 5))
@@ -83,9 +144,21 @@ def plot_trend_line(df, out_path: Path, top_n: int = NUM_TOP_COINS) -> None:
 
 def main() -> None:
     DOCS_DIR.mkdir(parents=True, exist_ok=True)
-    df = load_data()
-    plot_correlation_matrix(df, DOCS_DIR / "correlation_matrix.png")
-    plot_trend_line(df, DOCS_DIR / "trend_line.png")
+    conn, df = load_data()
+    targets = [DOCS_DIR / "correlation_matrix.png", DOCS_DIR / "trend_line.png"]
+    h = content_hash(df)
+    if (
+        HASH_SIDECAR.exists()
+        and HASH_SIDECAR.read_text().strip() == h
+        and all(t.exists() for t in targets)
+    ):
+        conn.close()
+        print(f"Figures in {DOCS_DIR} already match data (hash {h[:12]}…); skipping render")
+        return
+    plot_correlation_matrix(conn, targets[0])
+    plot_trend_line(df, targets[1])
+    conn.close()
+    HASH_SIDECAR.write_text(h + "\n")
     print(f"Figures saved to {DOCS_DIR}")
 
 
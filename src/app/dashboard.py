@@ -6,7 +6,18 @@ Run with: streamlit run src/app/dashboard.py
 
 import streamlit as st
 
-from src.config import DB_PATH, get_data_dir
+from src.config import DB_PATH, get_data_dir, open_db
+
+
+@st.cache_data(ttl=60)
+def load_prices(db_path: str):
+    """Load crypto_prices as an Arrow table; cached across reruns for 60s."""
+    conn = open_db(db_path, read_only=True)
+    # .arrow() is the zero-copy fast path; st.dataframe is Arrow-native,
+    # so pandas is skipped entirely.
+    table = conn.execute("SELECT * FROM crypto_prices ORDER BY market_cap_rank NULLS LAST").arrow()
+    conn.close()
+    return table
 
 
 def main() -> None:
@@ -25,18 +36,14 @@ def main() -> None:
         )
         return
 
-    import duckdb
-
-    conn = duckdb.connect(str(db), read_only=True)
-    df = conn.execute("SELECT * FROM crypto_prices ORDER BY market_cap_rank NULLS LAST").fetchdf()
-    conn.close()
+    table = load_prices(str(db))
 
-    if df.empty:
+    if table.num_rows == 0:
         st.info("Table is empty. Run ingestion and transformation first.")
         return
 
-    st.dataframe(df, use_container_width=True)
-    st.metric("Coins loaded", len(df))
+    st.dataframe(table, use_container_width=True)
+    st.metric("Coins loaded", table.num_rows)
 
 
 if __name__ == "__main__":
@@ -28,3 +28,26 @@ def get_data_dir() -> Path:
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     RAW_DATA_DIR.mkdir(parents=True, exist_ok=True)
     return DATA_DIR
+
+
+def open_db(db_path: str | None = None, read_only: bool = False):
+    """
+    Open a DuckDB connection with the pipeline's analytics pragmas applied.
+
+    Caps memory, pins the thread pool, and enables the object cache so
+    repeated reads (dashboard reruns, figure regeneration) stay warm.
+
+    Args:
+        db_path: Path to the DuckDB file (default: config DB_PATH).
+        read_only: Open in read-only mode (for dashboard/figures).
+
+    Returns:
+        A configured duckdb.DuckDBPyConnection.
+    """
+    import duckdb  # deferred: keeps config import cheap for non-DB callers
+
+    conn = duckdb.connect(db_path or DB_PATH, read_only=read_only)
+    conn.execute("PRAGMA threads=4")
+    conn.execute("PRAGMA memory_limit='512MB'")
+    conn.execute("PRAGMA enable_object_cache")
+    return conn
@@ -6,12 +6,16 @@ to data/raw for idempotent reprocessing. Run as:
     python -m src.ingestion.main
 """
 
-import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from math import ceil
 from pathlib import Path
 
+import polars as pl
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter, Retry
 
 from src.config import (
     COINGECKO_BASE_URL,
@@ -26,6 +30,21 @@ load_dotenv()
 
 logger = get_logger(__name__)
 
+# Shared session: keep-alive avoids a TCP+TLS handshake per call when
+# ingestion runs on a schedule, and retries cover transient API hiccups.
+_SESSION = requests.Session()
+_SESSION.headers.update({"Accept-Encoding": "gzip", "User-Agent": "elt-crypto/1.0"})
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503]),
+)
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
+
+PER_PAGE = 250  # CoinGecko's per_page cap for /coins/markets
+_MAX_CONCURRENT_PAGES = 4  # Matches the session pool size; respects rate limits
+
 
 class IngestionError(Exception):
     """Raised when ingestion fails (API, IO, or validation)."""
@@ -33,6 +52,16 @@ class IngestionError(Exception):
     pass
 
 
+def _fetch_page(url: str, params: dict, page: int) -> list[dict]:
+    """Fetch one /coins/markets page and return its records."""
+    resp = _SESSION.get(url, params={**params, "page": page}, timeout=30)
+    resp.raise_for_status()
+    data = resp.json()
+    if not isinstance(data, list):
+        raise IngestionError(f"API returned non-list payload: type={type(data)}")
+    return data
+
+
 def fetch_crypto_prices(
     coin_ids: str = DEFAULT_COINS,
     vs_currency: str = DEFAULT_CURRENCY,
@@ -57,17 +86,21 @@ def fetch_crypto_prices(
         "vs_currency": vs_currency,
         "ids": coin_ids,
         "order": "market_cap_desc",
-        "per_page": 250,
-        "page": 1,
+        "per_page": PER_PAGE,
         "sparkline": "false",
     }
+    n_ids = len([c for c in coin_ids.split(",") if c.strip()])
+    n_pages = max(1, ceil(n_ids / PER_PAGE))
     try:
-        logger.info("Fetching crypto prices from %s (coins=%s)", url, coin_ids)
-        resp = requests.get(url, params=params, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
-        if not isinstance(data, list):
-            raise IngestionError(f"API returned non-list payload: type={type(data)}")
+        logger.info("Fetching crypto prices from %s (coins=%s, pages=%d)", url, coin_ids, n_pages)
+        if n_pages == 1:
+            data = _fetch_page(url, params, 1)
+        else:
+            # Fan out page fetches over the pooled session; concurrency is
+            # bounded so we stay inside CoinGecko's rate limit.
+            with ThreadPoolExecutor(max_workers=min(_MAX_CONCURRENT_PAGES, n_pages)) as pool:
+                pages = pool.map(lambda p: _fetch_page(url, params, p), range(1, n_pages + 1))
+                data = [record for page in pages for record in page]
         logger.info("Fetched %d coins", len(data))
         return data
     except requests.RequestException as e:
@@ -80,7 +113,11 @@ def fetch_crypto_prices(
 
 def save_raw(payload: list[dict], output_dir: Path | None = None) -> Path:
     """
-    Persist raw API response to a timestamped JSON file for replayability.
+    Persist raw API response to a timestamped Parquet file for replayability.
+
+    Parquet (zstd-compressed) is a fraction of the size of the JSON payload
+    and gives downstream readers a zero-copy columnar scan instead of a
+    JSON parse.
 
     Args:
         payload: List of coin objects from CoinGecko.
@@ -101,13 +138,21 @@ def save_raw(payload: list[dict], output_dir: Path | None = None) -> Path:
         raise IngestionError(f"Cannot create output directory: {e}") from e
 
     ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-    path = output_dir / f"crypto_prices_{ts}.json"
+    path = output_dir / f"crypto_prices_{ts}.parquet"
+    # Write to a sibling temp file and rename into place: os.replace is
+    # atomic, so readers globbing for *.parquet never see a partial file.
+    tmp = path.with_suffix(path.suffix + ".tmp")
     try:
-        with open(path, "w") as f:
-            json.dump(payload, f, indent=2)
+        # infer_schema_length=None scans every record: the default (100)
+        # silently truncates late fractional values and chokes on columns
+        # that are null for the first 100 rows, and full pages are 250 rows.
+        df = pl.DataFrame(payload, infer_schema_length=None)
+        df.write_parquet(tmp, compression="zstd", compression_level=3)
+        os.replace(tmp, path)
         logger.info("Saved raw data to %s (%d records)", path, len(payload))
         return path
-    except (OSError, TypeError, ValueError) as e:
+    except (OSError, TypeError, ValueError, pl.exceptions.PolarsError) as e:
+        tmp.unlink(missing_ok=True)
         logger.exception("Failed to write %s: %s", path, e)
         raise IngestionError(f"Failed to write raw file: {e}") from e
 
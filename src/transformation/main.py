@@ -1,8 +1,9 @@
 """
 Transformation: read raw crypto data, clean with Polars, load into DuckDB.
 
-This is the Transform + Load step. It reads the latest raw JSON (or all),
-builds a normalized schema with Polars, and upserts into a DuckDB table.
+This is the Transform + Load step. For Parquet raw files the whole
+read → cast → load pipeline runs as one DuckDB SQL statement; older
+NDJSON/JSON files fall back to Polars cleaning before the DuckDB upsert.
 Run as:
     python -m src.transformation.main
 """
@@ -12,7 +13,7 @@ from pathlib import Path
 import duckdb
 import polars as pl
 
-from src.config import DB_PATH, RAW_DATA_DIR, get_data_dir
+from src.config import DB_PATH, RAW_DATA_DIR, get_data_dir, open_db
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -40,13 +41,47 @@ PRICE_COLUMNS = [
     "last_updated",
 ]
 
+# Explicit NDJSON schema for PRICE_COLUMNS: skips Polars' inference pass
+# entirely and drops columns we do not persist.
+RAW_SCHEMA: dict[str, pl.DataType] = {
+    "id": pl.String,
+    "symbol": pl.String,
+    "name": pl.String,
+    "current_price": pl.Float64,
+    "market_cap": pl.Float64,
+    "total_volume": pl.Float64,
+    "high_24h": pl.Float64,
+    "low_24h": pl.Float64,
+    "price_change_24h": pl.Float64,
+    "price_change_percentage_24h": pl.Float64,
+    "market_cap_rank": pl.Float64,
+    "last_updated": pl.String,
+}
+
+
+def _latest_raw_path(raw_dir: Path) -> Path | None:
+    """Return the most recent raw file in raw_dir, or None if there is none."""
+    files = sorted(
+        [
+            *raw_dir.glob("crypto_prices_*.parquet"),
+            *raw_dir.glob("crypto_prices_*.ndjson"),
+            *raw_dir.glob("crypto_prices_*.json"),
+        ],
+        key=lambda p: p.stem,
+        reverse=True,
+    )
+    return files[0] if files else None
+
 
 def read_raw_latest(raw_dir: Path | None = None) -> pl.DataFrame:
     """
-    Read the most recent raw JSON file from the raw data directory.
+    Read the most recent raw file from the raw data directory.
+
+    Parquet files get a zero-copy columnar scan; NDJSON and plain JSON
+    remain as fallbacks for files written before the Parquet switch.
 
     Args:
-        raw_dir: Directory containing raw JSON files (default: config RAW_DATA_DIR).
+        raw_dir: Directory containing raw files (default: config RAW_DATA_DIR).
 
     Returns:
         Polars DataFrame with selected columns; empty DataFrame if no files.
@@ -56,15 +91,24 @@ def read_raw_latest(raw_dir: Path | None = None) -> pl.DataFrame:
         logger.warning("Raw directory does not exist: %s", raw_dir)
         return pl.DataFrame()
 
-    files = sorted(raw_dir.glob("crypto_prices_*.json"), reverse=True)
-    if not files:
-        logger.warning("No raw JSON files found in %s", raw_dir)
+    path = _latest_raw_path(raw_dir)
+    if path is None:
+        logger.warning("No raw files found in %s", raw_dir)
         return pl.DataFrame()
 
-    path = files[0]
     try:
-        df = pl.read_json(path)
-        available = [c for c in PRICE_COLUMNS if c in df.columns]
+        if path.suffix == ".parquet":
+            df = pl.read_parquet(path)
+        elif path.suffix == ".ndjson":
+            df = pl.read_ndjson(path, schema=RAW_SCHEMA)
+        else:
+            try:
+                df = pl.read_json(path, schema_overrides=RAW_SCHEMA)
+            except pl.exceptions.SchemaFieldNotFoundError:
+                # Legacy file missing an expected column; fall back to inference
+                df = pl.read_json(path)
+        cols_set = frozenset(df.columns)
+        available = [c for c in PRICE_COLUMNS if c in cols_set]
         out = df.select(available) if available else df
         logger.info("Read %d rows from %s", len(out), path.name)
         return out
@@ -77,8 +121,12 @@ def transform(df: pl.DataFrame) -> pl.DataFrame:
     """
     Clean and normalize the raw DataFrame for loading.
 
-    - Cast numeric columns, parse last_updated to datetime.
-    - Ensure consistent column order.
+    The schema-aware readers in read_raw_latest usually deliver final
+    dtypes, but the inference fallbacks (legacy JSON missing a column,
+    Parquet written from inferred payloads) may not — so the Float64
+    casts are re-applied here; they are free when dtypes already match.
+    Safe on empty/columnless frames — the column checks make it a no-op,
+    so the empty-guard lives only at the run_transformation level.
 
     Args:
         df: Raw DataFrame from read_raw_latest.
@@ -86,43 +134,122 @@ def transform(df: pl.DataFrame) -> pl.DataFrame:
     Returns:
         Cleaned DataFrame ready for DuckDB.
     """
-    if df.is_empty():
-        return df
-
-    out = df.clone()
-    # Coerce numerics (API may return nulls)
-    for col in [
-        "current_price",
-        "market_cap",
-        "total_volume",
-        "high_24h",
-        "low_24h",
-        "price_change_24h",
-        "price_change_percentage_24h",
-        "market_cap_rank",
-    ]:
-        if col in out.columns:
-            out = out.with_columns(pl.col(col).cast(pl.Float64))
-
-    if "last_updated" in out.columns:
-        out = out.with_columns(
-            pl.col("last_updated").str.to_datetime(time_zone="UTC", strict=False)
-        )
+    # No defensive clone: with_columns returns a new frame and never
+    # mutates its input. One projection runs all casts in parallel.
+    exprs = [
+        pl.col(col).cast(pl.Float64)
+        for col, dtype in RAW_SCHEMA.items()
+        if dtype == pl.Float64 and col in df.columns
+    ]
+    if "last_updated" in df.columns and df["last_updated"].dtype == pl.String:
+        exprs.append(pl.col("last_updated").str.to_datetime(time_zone="UTC", strict=False))
+    out = df.with_columns(exprs) if exprs else df
     logger.debug("Transformed %d rows", len(out))
     return out
 
 
-def load_to_duckdb(df: pl.DataFrame, db_path: str = DB_PATH) -> None:
+# SQL-side analogue of RAW_SCHEMA for the fused path (None = keep as read)
+_FUSED_CASTS: dict[str, str | None] = {
+    "id": None,
+    "symbol": None,
+    "name": None,
+    "current_price": "DOUBLE",
+    "market_cap": "DOUBLE",
+    "total_volume": "DOUBLE",
+    "high_24h": "DOUBLE",
+    "low_24h": "DOUBLE",
+    "price_change_24h": "DOUBLE",
+    "price_change_percentage_24h": "DOUBLE",
+    "market_cap_rank": "DOUBLE",
+    "last_updated": "TIMESTAMPTZ",
+}
+
+
+def _fused_select(conn: duckdb.DuckDBPyConnection, raw_path: Path) -> str:
+    """
+    Build the fused transform SELECT over the raw Parquet file.
+
+    Only columns actually present in the file are selected/cast, matching
+    read_raw_latest's tolerance of raw files missing expected columns.
+    """
+    described = conn.execute("DESCRIBE SELECT * FROM read_parquet(?)", [str(raw_path)]).fetchall()
+    cols_set = frozenset(r[0] for r in described)
+    available = [c for c in PRICE_COLUMNS if c in cols_set]
+    if not available:
+        return "SELECT * FROM read_parquet(?)"
+    exprs = ", ".join(
+        f'CAST("{c}" AS {_FUSED_CASTS[c]}) AS "{c}"' if _FUSED_CASTS[c] else f'"{c}"'
+        for c in available
+    )
+    return f"SELECT {exprs} FROM read_parquet(?)"
+
+
+def _table_exists(conn: duckdb.DuckDBPyConnection, table: str) -> bool:
+    """Return True if the given table exists in the main schema."""
+    row = conn.execute(
+        "SELECT count(*) FROM information_schema.tables WHERE table_name = ?",
+        [table],
+    ).fetchone()
+    return bool(row and row[0])
+
+
+def _missing_target_columns(conn: duckdb.DuckDBPyConnection, source: str) -> list[tuple[str, str]]:
+    """Return (name, type) for columns the staged source has but crypto_prices lacks."""
+    target = {
+        r[0]
+        for r in conn.execute(
+            "SELECT column_name FROM information_schema.columns WHERE table_name = 'crypto_prices'"
+        ).fetchall()
+    }
+    described = conn.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()
+    return [(r[0], r[1]) for r in described if r[0] not in target]
+
+
+def _write_table(conn: duckdb.DuckDBPyConnection, source: str, mode: str) -> None:
+    """
+    Write rows from the given relation into crypto_prices.
+
+    Creates the table on first run or with mode="replace"; otherwise upserts
+    keyed on `id` inside a transaction (DELETE matching ids, bulk INSERT).
+    BY NAME tolerates columns the source lacks (filled with NULL); columns
+    the target lacks are added first, so the upsert survives column drift
+    in either direction.
+    """
+    if mode == "replace" or not _table_exists(conn, "crypto_prices"):
+        conn.execute(f"CREATE OR REPLACE TABLE crypto_prices AS SELECT * FROM {source}")
+        return
+    conn.execute("BEGIN")
+    try:
+        for name, dtype in _missing_target_columns(conn, source):
+            conn.execute(f'ALTER TABLE crypto_prices ADD COLUMN "{name}" {dtype}')
+        conn.execute(f"DELETE FROM crypto_prices WHERE id IN (SELECT id FROM {source})")
+        conn.execute(f"INSERT INTO crypto_prices BY NAME SELECT * FROM {source}")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def load_to_duckdb(df: pl.DataFrame, db_path: str = DB_PATH, mode: str = "append") -> None:
     """
-    Create or replace the crypto_prices table in DuckDB with the given DataFrame.
+    Load the given DataFrame into the crypto_prices table in DuckDB.
+
+    With mode="append" (default), existing rows are upserted keyed on `id`:
+    only rows for the incoming coins are rewritten instead of the whole table.
+    With mode="replace", the table is rebuilt from scratch. The first run
+    always creates the table.
 
     Args:
         df: Cleaned Polars DataFrame.
         db_path: Path to DuckDB file (default from config).
+        mode: "append" for incremental upsert, "replace" for a full rebuild.
 
     Raises:
-        TransformationError: On DB connection or write failure.
+        TransformationError: On DB connection or write failure, or invalid mode.
     """
+    if mode not in ("append", "replace"):
+        raise TransformationError(f"Invalid load mode: {mode!r} (expected 'append' or 'replace')")
+
     path = Path(db_path)
     try:
         path.parent.mkdir(parents=True, exist_ok=True)
@@ -131,31 +258,92 @@ def load_to_duckdb(df: pl.DataFrame, db_path: str = DB_PATH) -> None:
         raise TransformationError(f"Cannot create DB directory: {e}") from e
 
     try:
-        conn = duckdb.connect(str(path))
-        conn.register("prices_df", df.to_pandas())
-        conn.execute(
-            """
-            CREATE OR REPLACE TABLE crypto_prices AS
-            SELECT * FROM prices_df
-        """
-        )
-        conn.close()
-        logger.info("Loaded %d rows into %s", len(df), path)
+        conn = open_db(str(path))
+        try:
+            # Registering the Polars frame exposes it via the Arrow C Data
+            # Interface — no pandas intermediate copy. Bulk INSERT goes through
+            # DuckDB's appender, writing chunks straight into storage blocks
+            # instead of per-row inserts.
+            conn.register("staged_prices", df)
+            _write_table(conn, "staged_prices", mode)
+            conn.unregister("staged_prices")
+        finally:
+            conn.close()
+        logger.info("Loaded %d rows into %s (mode=%s)", len(df), path, mode)
+    except TransformationError:
+        raise
     except Exception as e:
         logger.exception("DuckDB load failed: %s", e)
         raise TransformationError(f"DuckDB load failed: {e}") from e
 
 
+def transform_load_fused(
+    raw_path: Path, db_path: str = DB_PATH, mode: str = "append"
+) -> pl.DataFrame:
+    """
+    Transform and load a raw Parquet file in a single DuckDB SQL statement.
+
+    The whole read → cast → load pipeline runs inside DuckDB's vectorized
+    engine, so no Polars/pandas intermediates are materialized in Python.
+    Columns missing from the raw file are simply skipped, like the Polars
+    fallback path.
+
+    Args:
+        raw_path: Path to a raw Parquet file.
+        db_path: DuckDB database path.
+        mode: "append" for incremental upsert, "replace" for a full rebuild.
+
+    Returns:
+        The transformed rows as a Polars DataFrame (for parity with the
+        Polars fallback path).
+
+    Raises:
+        TransformationError: On DB connection or write failure, or invalid mode.
+    """
+    if mode not in ("append", "replace"):
+        raise TransformationError(f"Invalid load mode: {mode!r} (expected 'append' or 'replace')")
+
+    path = Path(db_path)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logger.exception("Cannot create DB directory %s: %s", path.parent, e)
+        raise TransformationError(f"Cannot create DB directory: {e}") from e
+
+    try:
+        conn = open_db(str(path))
+        try:
+            select = _fused_select(conn, raw_path)
+            conn.execute(f"CREATE OR REPLACE TEMP TABLE staged_prices AS {select}", [str(raw_path)])
+            _write_table(conn, "staged_prices", mode)
+            out = conn.execute("SELECT * FROM staged_prices").pl()
+            conn.execute("DROP TABLE staged_prices")
+        finally:
+            conn.close()
+        logger.info("Loaded %d rows into %s (fused, mode=%s)", len(out), path, mode)
+        return out
+    except TransformationError:
+        raise
+    except Exception as e:
+        logger.exception("Fused transform/load failed: %s", e)
+        raise TransformationError(f"Fused transform/load failed: {e}") from e
+
+
 def run_transformation(
     raw_dir: Path | None = None,
     db_path: str = DB_PATH,
+    mode: str = "append",
 ) -> pl.DataFrame:
     """
-    Run full transform + load: read latest raw → transform → load to DuckDB.
+    Run full transform + load on the latest raw file.
+
+    Parquet files take the fused single-statement DuckDB path; older
+    NDJSON/JSON files fall back to the Polars read → transform → load steps.
 
     Args:
         raw_dir: Raw data directory (default from config).
         db_path: DuckDB database path.
+        mode: Load mode ("append" or "replace").
 
     Returns:
         The transformed Polars DataFrame (before load).
@@ -165,12 +353,19 @@ def run_transformation(
     """
     logger.info("Starting transformation")
     get_data_dir()
+    raw_dir = Path(raw_dir or RAW_DATA_DIR)
+    raw_path = _latest_raw_path(raw_dir) if raw_dir.exists() else None
+    if raw_path is not None and raw_path.suffix == ".parquet":
+        df = transform_load_fused(raw_path, db_path=db_path, mode=mode)
+        logger.info("Transformation complete")
+        return df
+
     df = read_raw_latest(raw_dir=raw_dir)
     if df.is_empty():
         logger.warning("No raw data to transform")
         return df
     df = transform(df)
-    load_to_duckdb(df, db_path=db_path)
+    load_to_duckdb(df, db_path=db_path, mode=mode)
     logger.info("Transformation complete")
     return df
 
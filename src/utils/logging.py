@@ -1,13 +1,27 @@
 """Centralized logging configuration for the ELT pipeline."""
 
+import functools
 import logging
 import sys
 
+# One formatter/handler pair shared by every logger: built once at import,
+# so get_logger never re-parses the format string or duplicates handlers.
+_FORMATTER = logging.Formatter(
+    "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+_HANDLER = logging.StreamHandler(sys.stdout)
+_HANDLER.setFormatter(_FORMATTER)
 
+
+@functools.cache
 def get_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     """
     Return a configured logger with a consistent format.
 
+    Cached on (name, level): repeated calls skip the handler/formatter
+    setup entirely.
+
     Args:
         name: Logger name (typically __name__ of the calling module).
         level: Log level (default INFO).
@@ -19,12 +33,5 @@ def get_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     if logger.handlers:
         return logger
     logger.setLevel(level)
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(level)
-    formatter = logging.Formatter(
-        "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    logger.addHandler(_HANDLER)
     return logger
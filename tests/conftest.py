@@ -51,7 +51,25 @@ def raw_dir(tmp_path: Path) -> Path:
 
 @pytest.fixture
 def raw_json_file(raw_dir: Path, sample_crypto_payload: list[dict]) -> Path:
-    """Write sample payload to a raw JSON file and return its path."""
+    """Write sample payload to a legacy raw JSON file and return its path."""
     path = raw_dir / "crypto_prices_20240115_120000.json"
     path.write_text(json.dumps(sample_crypto_payload))
     return path
+
+
+@pytest.fixture
+def raw_ndjson_file(raw_dir: Path, sample_crypto_payload: list[dict]) -> Path:
+    """Write sample payload to a raw NDJSON file and return its path."""
+    path = raw_dir / "crypto_prices_20240115_120000.ndjson"
+    path.write_text("".join(json.dumps(rec) + "\n" for rec in sample_crypto_payload))
+    return path
+
+
+@pytest.fixture
+def raw_parquet_file(raw_dir: Path, sample_crypto_payload: list[dict]) -> Path:
+    """Write sample payload to a raw Parquet file and return its path."""
+    import polars as pl
+
+    path = raw_dir / "crypto_prices_20240115_120000.parquet"
+    pl.DataFrame(sample_crypto_payload).write_parquet(path)
+    return path
@@ -1,6 +1,5 @@
 """Tests for the ingestion module."""
 
-import json
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -8,18 +7,36 @@ from src.ingestion.main import fetch_crypto_prices, run_ingestion, save_raw
 
 
 def test_save_raw(sample_crypto_payload: list[dict], raw_dir: Path) -> None:
-    """save_raw writes valid JSON and returns the file path."""
+    """save_raw writes a readable Parquet file and returns the file path."""
+    import polars as pl
+
     path = save_raw(sample_crypto_payload, output_dir=raw_dir)
     assert path.exists()
-    assert path.suffix == ".json"
-    data = json.loads(path.read_text())
-    assert len(data) == 2
-    assert data[0]["id"] == "bitcoin"
+    assert path.suffix == ".parquet"
+    df = pl.read_parquet(path)
+    assert len(df) == 2
+    assert df["id"].to_list()[0] == "bitcoin"
+
+
+def test_save_raw_infers_schema_from_all_rows(
+    sample_crypto_payload: list[dict], raw_dir: Path
+) -> None:
+    """Values past the first 100 rows must not be truncated or rejected."""
+    import polars as pl
 
+    payload = [dict(sample_crypto_payload[0], id=f"coin{i}", current_price=1) for i in range(120)]
+    payload[110]["current_price"] = 0.5  # fractional only after the default inference window
+    payload[0]["roi"] = None  # null until late, like CoinGecko's roi column
+    payload[110]["roi"] = 1.5
+    path = save_raw(payload, output_dir=raw_dir)
+    df = pl.read_parquet(path)
+    assert df["current_price"][110] == 0.5
+    assert df["roi"][110] == 1.5
 
-@patch("src.ingestion.main.requests.get")
+
+@patch("src.ingestion.main._SESSION.get")
 def test_fetch_crypto_prices(mock_get: MagicMock, sample_crypto_payload: list[dict]) -> None:
-    """fetch_crypto_prices returns parsed JSON from API."""
+    """fetch_crypto_prices returns parsed JSON from API via the shared session."""
     mock_get.return_value.json.return_value = sample_crypto_payload
     mock_get.return_value.raise_for_status = MagicMock()
 
@@ -29,6 +46,22 @@ def test_fetch_crypto_prices(mock_get: MagicMock, sample_crypto_payload: list[di
     mock_get.return_value.raise_for_status.assert_called_once()
 
 
+@patch("src.ingestion.main._SESSION.get")
+def test_fetch_crypto_prices_paginates(
+    mock_get: MagicMock, sample_crypto_payload: list[dict]
+) -> None:
+    """fetch_crypto_prices fans out one request per 250 coin ids."""
+    mock_get.return_value.json.return_value = sample_crypto_payload
+    mock_get.return_value.raise_for_status = MagicMock()
+
+    coin_ids = ",".join(f"coin{i}" for i in range(300))
+    result = fetch_crypto_prices(coin_ids=coin_ids, vs_currency="usd")
+    assert mock_get.call_count == 2
+    assert len(result) == 4  # two pages of the two-record sample payload
+    pages = sorted(call.kwargs["params"]["page"] for call in mock_get.call_args_list)
+    assert pages == [1, 2]
+
+
 def test_run_ingestion(raw_dir: Path, sample_crypto_payload: list[dict]) -> None:
     """run_ingestion with mocked fetch writes raw file."""
     with (
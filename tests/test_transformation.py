@@ -4,7 +4,12 @@ from pathlib import Path
 
 import polars as pl
 
-from src.transformation.main import load_to_duckdb, read_raw_latest, transform
+from src.transformation.main import (
+    load_to_duckdb,
+    read_raw_latest,
+    run_transformation,
+    transform,
+)
 
 
 def test_read_raw_latest_empty(tmp_path: Path) -> None:
@@ -14,19 +19,36 @@ def test_read_raw_latest_empty(tmp_path: Path) -> None:
 
 
 def test_read_raw_latest(raw_json_file: Path) -> None:
-    """read_raw_latest reads the most recent JSON file."""
+    """read_raw_latest reads legacy JSON files as a fallback."""
     df = read_raw_latest(raw_dir=raw_json_file.parent)
     assert len(df) == 2
     assert "current_price" in df.columns
     assert df["id"].to_list() == ["bitcoin", "ethereum"]
 
 
+def test_read_raw_latest_parquet(raw_parquet_file: Path) -> None:
+    """read_raw_latest prefers Parquet files."""
+    df = read_raw_latest(raw_dir=raw_parquet_file.parent)
+    assert len(df) == 2
+    assert df["id"].to_list() == ["bitcoin", "ethereum"]
+
+
+def test_read_raw_latest_ndjson(raw_ndjson_file: Path) -> None:
+    """read_raw_latest reads NDJSON files with the explicit schema."""
+    df = read_raw_latest(raw_dir=raw_ndjson_file.parent)
+    assert len(df) == 2
+    assert df["current_price"].dtype == pl.Float64
+    assert df["id"].to_list() == ["bitcoin", "ethereum"]
+
+
 def test_transform(sample_crypto_payload: list[dict]) -> None:
     """transform returns DataFrame with correct dtypes."""
     df = pl.DataFrame(sample_crypto_payload)
     out = transform(df)
     assert out.shape[0] == 2
     assert out["current_price"].dtype == pl.Float64
+    # Integer-inferred numerics (e.g. market_cap) must still be cast
+    assert out["market_cap"].dtype == pl.Float64
 
 
 def test_load_to_duckdb(sample_crypto_payload: list[dict], tmp_path: Path) -> None:
@@ -41,3 +63,65 @@ def test_load_to_duckdb(sample_crypto_payload: list[dict], tmp_path: Path) -> No
     conn.close()
     assert len(rows) == 2
     assert rows[0][0] == "bitcoin"
+
+
+def test_load_to_duckdb_append_upserts(sample_crypto_payload: list[dict], tmp_path: Path) -> None:
+    """Appending overlapping ids replaces their rows instead of duplicating them."""
+    import duckdb
+
+    df = pl.DataFrame(sample_crypto_payload)
+    db_path = str(tmp_path / "test.duckdb")
+    load_to_duckdb(df, db_path=db_path)
+    updated = df.with_columns(pl.col("current_price") * 2)
+    load_to_duckdb(updated, db_path=db_path, mode="append")
+    conn = duckdb.connect(db_path, read_only=True)
+    rows = conn.execute("SELECT id, current_price FROM crypto_prices ORDER BY id").fetchall()
+    conn.close()
+    assert len(rows) == 2
+    assert rows[0] == ("bitcoin", 86500.0)
+
+
+def test_load_to_duckdb_append_adds_missing_columns(
+    sample_crypto_payload: list[dict], tmp_path: Path
+) -> None:
+    """Appending a frame with a column the existing table lacks adds it."""
+    import duckdb
+
+    legacy = pl.DataFrame(sample_crypto_payload).drop("market_cap_rank")
+    db_path = str(tmp_path / "test.duckdb")
+    load_to_duckdb(legacy, db_path=db_path)
+    load_to_duckdb(pl.DataFrame(sample_crypto_payload), db_path=db_path, mode="append")
+    conn = duckdb.connect(db_path, read_only=True)
+    rows = conn.execute("SELECT id, market_cap_rank FROM crypto_prices ORDER BY id").fetchall()
+    conn.close()
+    assert rows == [("bitcoin", 1), ("ethereum", 2)]
+
+
+def test_run_transformation_fused_parquet(raw_parquet_file: Path, tmp_path: Path) -> None:
+    """run_transformation takes the fused DuckDB path for Parquet raw files."""
+    import duckdb
+
+    db_path = str(tmp_path / "test.duckdb")
+    df = run_transformation(raw_dir=raw_parquet_file.parent, db_path=db_path)
+    assert len(df) == 2
+    assert df["current_price"].dtype == pl.Float64
+    conn = duckdb.connect(db_path, read_only=True)
+    rows = conn.execute("SELECT id FROM crypto_prices ORDER BY id").fetchall()
+    conn.close()
+    assert [r[0] for r in rows] == ["bitcoin", "ethereum"]
+
+
+def test_run_transformation_fused_tolerates_missing_columns(
+    raw_dir: Path, sample_crypto_payload: list[dict], tmp_path: Path
+) -> None:
+    """The fused path skips expected columns absent from the raw Parquet file."""
+    payload = [
+        {k: v for k, v in rec.items() if k != "market_cap_rank"} for rec in sample_crypto_payload
+    ]
+    path = raw_dir / "crypto_prices_20240115_120000.parquet"
+    pl.DataFrame(payload).write_parquet(path)
+    db_path = str(tmp_path / "test.duckdb")
+    df = run_transformation(raw_dir=raw_dir, db_path=db_path)
+    assert len(df) == 2
+    assert "market_cap_rank" not in df.columns
+    assert df["current_price"].dtype == pl.Float64